@@ -17,14 +17,42 @@ Requires:
 from __future__ import annotations
 
 import argparse
-from typing import Dict, List
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
 
 import numpy as np
-import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 
+# Parquet layout: bounded row groups and statistics for pushdown/parallel scans,
+# dictionary encoding only where values repeat (the category column)
+ROW_GROUP_SIZE = 262_144
+# Each written batch starts a new row group, so batches match the row-group size
+DEFAULT_BATCH_SIZE = ROW_GROUP_SIZE
+PARQUET_WRITER_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "data_page_size": 1 << 20,
+    "use_dictionary": ["product_category"],
+    "write_statistics": True,
+}
+
+PRODUCT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("product_category", pa.dictionary(pa.int32(), pa.string())),
+        ("product_name", pa.string()),
+        ("price_usd", pa.float64()),
+        ("inventory_count", pa.int32()),
+        ("margin", pa.float64()),
+    ]
+)
+
 # -----------------------
 # Category -> product title templates (Amazon-like, human readable)
 # -----------------------
@@ -267,29 +295,125 @@ SIZES = [
     " 20000mAh",
 ]
 
+# Object-array copies of the pools above, built once so titles can be gathered by index
+CATEGORY_ARRAYS: Dict[str, np.ndarray] = {cat: np.array(bases, dtype=object) for cat, bases in CATEGORY_PRODUCTS.items()}
+BRANDS_ARRAY = np.array(BRANDS, dtype=object)
+QUALIFIERS_ARRAY = np.array(QUALIFIERS, dtype=object)
+BUNDLE_HINTS_ARRAY = np.array(BUNDLE_HINTS, dtype=object)
+COLORS_ARRAY = np.array(COLORS, dtype=object)
+SIZES_ARRAY = np.array(SIZES, dtype=object)
 
-def make_amazon_title(rng: np.random.Generator, base: str) -> str:
+
+def make_amazon_titles(rng: np.random.Generator, categories: List[str], cat_idx: np.ndarray) -> pa.Array:
     """
-    Assemble an Amazon-like product title.
+    Assemble Amazon-like product titles for all rows at once.
+    Every title component is drawn as one bulk integer-index array, gathered
+    from the module-level object-array pools and joined column-wise with Arrow string kernels.
     Example:
       "Anker Upgraded Wireless Bluetooth Earbuds - Black (2 Pack)"
     """
-    brand = rng.choice(BRANDS)
-    qualifier = rng.choice(QUALIFIERS) if rng.random() < 0.75 else ""
-    size = rng.choice(SIZES)
-    color = rng.choice(COLORS)
-    bundle = rng.choice(BUNDLE_HINTS)
+    rows = len(cat_idx)
 
-    parts = [brand]
-    if qualifier:
-        parts.append(qualifier)
-    parts.append(base + size)
+    # Base product per row, drawn from the row's category pool
+    base_names = np.empty(rows, dtype=object)
+    for i, cat in enumerate(categories):
+        mask = cat_idx == i
+        bases_arr = CATEGORY_ARRAYS[cat]
+        base_names[mask] = bases_arr[rng.integers(0, len(bases_arr), int(mask.sum()))]
 
-    title = " ".join(p for p in parts if p).strip()
-    title = f"{title}{color}{bundle}".strip()
+    brands = BRANDS_ARRAY[rng.integers(0, len(BRANDS_ARRAY), rows)]
+    qmask = rng.random(rows) < 0.75
+    qualifiers = QUALIFIERS_ARRAY[rng.integers(0, len(QUALIFIERS_ARRAY), rows)]
+    sizes = SIZES_ARRAY[rng.integers(0, len(SIZES_ARRAY), rows)]
+    colors = COLORS_ARRAY[rng.integers(0, len(COLORS_ARRAY), rows)]
+    bundles = BUNDLE_HINTS_ARRAY[rng.integers(0, len(BUNDLE_HINTS_ARRAY), rows)]
 
-    # Clean up double spaces if any slipped in
-    return " ".join(title.split())
+    # Size/color/bundle carry their own leading separator, so join them without one
+    tail = pc.binary_join_element_wise(
+        pa.array(base_names, type=pa.string()),
+        pa.array(sizes, type=pa.string()),
+        pa.array(colors, type=pa.string()),
+        pa.array(bundles, type=pa.string()),
+        "",
+    )
+    # Omitted qualifiers are nulls, which "skip" drops together with their separator
+    return pc.binary_join_element_wise(
+        pa.array(brands, type=pa.string()),
+        pa.array(qualifiers, type=pa.string(), mask=~qmask),
+        tail,
+        " ",
+        null_handling="skip",
+    )
+
+
+def uniform_rounded(rng: np.random.Generator, low: float, high: float, size: int, decimals: int) -> np.ndarray:
+    """
+    Draw uniform floats in [low, high) rounded to `decimals`, reusing one buffer.
+    Same values as np.round(rng.uniform(low, high, size), decimals) without the
+    extra full-size temporaries.
+    """
+    out = rng.random(size)
+    np.multiply(out, high - low, out=out)
+    np.add(out, low, out=out)
+    np.round(out, decimals, out=out)
+    return out
+
+
+def make_batch(rng: np.random.Generator, categories: List[str], first_id: int, n: int) -> pa.RecordBatch:
+    """
+    Generate rows first_id .. first_id + n - 1 as one Arrow record batch.
+    """
+    ids = np.arange(first_id, first_id + n, dtype=np.int64)
+
+    # Stable, even distribution: round-robin category by id
+    cat_idx = ((ids - 1) % len(categories)).astype(np.int32)
+
+    product_names = make_amazon_titles(rng, categories, cat_idx)
+
+    # More e-commerce-ish price range; still synthetic
+    price_usd = uniform_rounded(rng, 4.99, 999.99, n, 2)
+    inventory_count = rng.integers(0, 250_000, n, dtype=np.int32)
+    margin = uniform_rounded(rng, 0.05, 0.75, n, 4)
+
+    # Build the Arrow batch directly; categories are already dictionary-encoded by cat_idx
+    return pa.RecordBatch.from_pydict(
+        {
+            "id": pa.array(ids, type=pa.int64()),
+            "product_category": pa.DictionaryArray.from_arrays(cat_idx, pa.array(categories, type=pa.string())),
+            "product_name": product_names,
+            "price_usd": pa.array(price_usd, type=pa.float64()),
+            "inventory_count": pa.array(inventory_count, type=pa.int32()),
+            "margin": pa.array(margin, type=pa.float64()),
+        },
+        schema=PRODUCT_SCHEMA,
+    )
+
+
+def generate_batch(task: Tuple[np.random.SeedSequence, int, int]) -> pa.RecordBatch:
+    """
+    Worker entry point: generate one batch from its own seed stream.
+    """
+    seed_seq, first_id, n = task
+    return make_batch(np.random.default_rng(seed_seq), list(CATEGORY_PRODUCTS.keys()), first_id, n)
+
+
+def generate_batches(tasks: List[Tuple[np.random.SeedSequence, int, int]], workers: int) -> Iterator[pa.RecordBatch]:
+    """
+    Yield generated batches in task order, in parallel when workers > 1.
+    At most 2 * workers batches are pending at once, so memory stays bounded
+    by --batch-size and --workers, not --rows.
+    """
+    if workers <= 1:
+        yield from map(generate_batch, tasks)
+        return
+    task_iter = iter(tasks)
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque(executor.submit(generate_batch, task) for task in islice(task_iter, 2 * workers))
+        while pending:
+            batch = pending.popleft().result()
+            yield batch
+            for task in islice(task_iter, 1):
+                pending.append(executor.submit(generate_batch, task))
 
 
 def main() -> None:
@@ -297,51 +421,38 @@ def main() -> None:
     parser.add_argument("--rows", type=int, default=1_000_000, help="Number of rows to generate.")
     parser.add_argument("--output", default="amazon_like_products.parquet", help="Output Parquet file path.")
     parser.add_argument("--seed", type=int, default=42, help="Seed for reproducible generation.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows generated and written per batch.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes generating batches.")
     args = parser.parse_args()
-
-    rng = np.random.default_rng(args.seed)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
 
     categories: List[str] = list(CATEGORY_PRODUCTS.keys())
     if len(categories) != 20:
         raise ValueError(f"Expected 20 categories, got {len(categories)}.")
 
-    rows = args.rows
-    ids = np.arange(1, rows + 1, dtype=np.int64)
-
-    # Stable, even distribution: round-robin category by id
-    cat_idx = (ids - 1) % len(categories)
-    product_categories = [categories[i] for i in cat_idx]
-
-    product_names: List[str] = []
-    for cat in product_categories:
-        base = rng.choice(CATEGORY_PRODUCTS[cat])
-        product_names.append(make_amazon_title(rng, base))
-
-    # More e-commerce-ish price range; still synthetic
-    df = pd.DataFrame(
-        {
-            "id": ids,
-            "product_category": product_categories,
-            "product_name": product_names,
-            "price_usd": np.round(rng.uniform(4.99, 999.99, rows), 2),
-            "inventory_count": rng.integers(0, 250_000, rows, dtype=np.int32),
-            "margin": np.round(rng.uniform(0.05, 0.75, rows), 4),
-        }
-    )
+    # One independent seed stream per batch: output depends on --seed and --batch-size, not --workers
+    first_ids = range(1, args.rows + 1, args.batch_size)
+    seeds = np.random.SeedSequence(args.seed).spawn(len(first_ids))
+    tasks = [(seed, first_id, min(args.batch_size, args.rows + 1 - first_id)) for seed, first_id in zip(seeds, first_ids)]
 
-    table = pa.Table.from_pandas(df, preserve_index=False)
-    pq.write_table(
-        table,
-        args.output,
-        compression="snappy",
-        use_dictionary=True,
-    )
+    # Workers generate batches in parallel; the single writer keeps them in id order.
+    # Only a small window of batches is in flight, so memory stays bounded by --batch-size, not --rows
+    # The writer is opened up front so a run with no rows still produces a valid, empty file
+    preview = None
+    with pq.ParquetWriter(args.output, PRODUCT_SCHEMA, **PARQUET_WRITER_OPTIONS) as writer:
+        # Never start more processes than there are batches to generate
+        for batch in generate_batches(tasks, min(args.workers, len(tasks))):
+            if preview is None:
+                preview = batch.slice(0, 10)
+            writer.write_batch(batch, row_group_size=ROW_GROUP_SIZE)
 
     print(f"Parquet written: {args.output}")
     print("Schema:")
-    print(table.schema)
-    print("\nSample rows:")
-    print(df.head(10).to_string(index=False))
+    print(PRODUCT_SCHEMA)
+    if preview is not None:
+        print("\nSample rows:")
+        print(preview.to_pandas().to_string(index=False))
 
 
 if __name__ == "__main__":
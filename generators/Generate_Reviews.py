@@ -10,11 +10,14 @@ from __future__ import annotations
 
 import argparse
 import random
-from datetime import datetime, timedelta
-from typing import Iterator, List, Optional
+from datetime import datetime
+from typing import Iterator, Optional
 
 import numpy as np
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
 
 # -----------------------
 # Config (same as before)
@@ -22,6 +25,20 @@ import pandas as pd
 MAX_REVIEW_CHARS = 100_000
 DEFAULT_MAX_REVIEWS = 5
 DEFAULT_BATCH_SIZE = 100_000
+UNIFORMS_PER_REVIEW = 11  # persona (5), rating, template picks (4), date
+
+# Parquet layout: bounded row groups and statistics for pushdown/parallel scans,
+# dictionary encoding only for the low-cardinality string columns.
+# Each batch's reviews start a new row group, so row groups hold one batch's output
+# (about 1.8 reviews per product read), split further only above ROW_GROUP_SIZE.
+ROW_GROUP_SIZE = 262_144
+PARQUET_WRITER_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "data_page_size": 1 << 20,
+    "use_dictionary": ["product_category", "reviewer_name", "reviewer_persona", "reviewer_location"],
+    "write_statistics": True,
+}
 
 PERSONAS = [
     {"persona": "Tech Enthusiast", "first_names": ["Alex", "Jordan", "Taylor", "Sam", "Riley", "Casey"],
@@ -50,6 +67,8 @@ PERSONAS = [
      "locations": ["Minneapolis, MN", "Dublin, IE", "Lima, PE"], "focus": "safety"},
 ]
 
+NUM_REVIEWS_WEIGHTS = np.array([0.20, 0.28, 0.22, 0.15, 0.10, 0.05])  # for 0..5 reviews per product
+
 BASE_RATING_PROBS = np.array([0.07, 0.11, 0.22, 0.33, 0.27])  # for 1..5
 
 CATEGORY_BIASES = {
@@ -61,6 +80,11 @@ CATEGORY_BIASES = {
     "Jewelry": 0.05, "General": 0.0,
 }
 
+# Categories travel through the pipeline as int8 codes into this list
+CATEGORY_NAMES = list(CATEGORY_BIASES)
+CATEGORY_NAME_ARRAY = pa.array(CATEGORY_NAMES, type=pa.string())
+GENERAL_CODE = CATEGORY_NAMES.index("General")
+
 BASE_TEMPLATES = {
     1: {"openers": ["Terrible experience with", "I regret buying", "Completely unsatisfied with"],
         "middles": ["It broke after a few uses and support did nothing.", "The build felt cheap and failed.", "Multiple defects and poor reliability."],
@@ -79,149 +103,226 @@ BASE_TEMPLATES = {
         "closers": ["Highly recommended!", "Five stars.", "Worth every penny."]},
 }
 
+POSITIVE_EXTRAS = ["It consistently performs well in daily use.", "Setup was straightforward and painless.", "Materials and fit/finish are impressive for the price."]
+NEUTRAL_EXTRAS = ["It's serviceable for common tasks but not outstanding.", "It does what it needs to, but don't expect surprises.", "Good for occasional use or budget setups."]
+NEGATIVE_EXTRAS = ["It caused repeated issues during normal use.", "Support and documentation were inadequate.", "I encountered multiple defects and usability problems."]
+
+FOCUS_PHRASES = {
+    "performance": "As someone who values performance, ",
+    "value": "As someone who looks for value, ",
+    "durability": "With kids in the house, ",
+    "weatherproofing": "I use it outdoors often, so ",
+    "ease_of_use": "I cook a lot and care about ease of use, so ",
+    "sound_quality": "As an audiophile, ",
+    "portability": "I travel a lot, so ",
+    "safety": "With pets around, ",
+}
+
+# PERSONAS flattened into parallel per-persona arrays; reviews carry only an int8 persona code
+PERSONA_NAME_ARRAY = pa.array([p["persona"] for p in PERSONAS], type=pa.string())
+PERSONA_PHRASE_ARRAY = pa.array([FOCUS_PHRASES.get(p["focus"], "") for p in PERSONAS], type=pa.string())
+PERSONA_FIRST = [np.array(p["first_names"], dtype=object) for p in PERSONAS]
+PERSONA_LAST = [np.array(p["last_names"], dtype=object) for p in PERSONAS]
+PERSONA_LOC = [np.array(p["locations"], dtype=object) for p in PERSONAS]
+PERSONA_AGE_LO = np.array([p["age_range"][0] for p in PERSONAS], dtype=np.int64)
+PERSONA_AGE_HI = np.array([p["age_range"][1] for p in PERSONAS], dtype=np.int64)
+
+# Template pools as (rating, choice) object arrays; row 0 is unused so ratings index directly
+_EMPTY_ROW = ["", "", ""]
+OPENERS = np.array([_EMPTY_ROW] + [BASE_TEMPLATES[r]["openers"] for r in range(1, 6)], dtype=object)
+MIDDLES = np.array([_EMPTY_ROW] + [BASE_TEMPLATES[r]["middles"] for r in range(1, 6)], dtype=object)
+CLOSERS = np.array([_EMPTY_ROW] + [BASE_TEMPLATES[r]["closers"] for r in range(1, 6)], dtype=object)
+EXTRAS = np.array([_EMPTY_ROW, NEGATIVE_EXTRAS, NEGATIVE_EXTRAS, NEUTRAL_EXTRAS, POSITIVE_EXTRAS, POSITIVE_EXTRAS], dtype=object)
+
 
 # -----------------------
 # Helper functions
 # -----------------------
-def sample_persona(rng: np.random.Generator) -> dict:
-    persona = rng.choice(PERSONAS)
-    first = rng.choice(persona["first_names"])
-    last = rng.choice(persona["last_names"])
-    full_name = f"{first} {last}"
-    age = int(rng.integers(persona["age_range"][0], persona["age_range"][1] + 1))
-    location = rng.choice(persona["locations"])
+def uniform_index(u: np.ndarray, n: int) -> np.ndarray:
+    """
+    Turn uniforms in [0, 1) into integer picks in [0, n).
+    """
+    return np.minimum((u * n).astype(np.int64), n - 1)
+
+
+def sample_personas(u: np.ndarray, ages_out: Optional[np.ndarray] = None) -> dict:
+    """
+    Draw one reviewer per column of `u`, a (5, n) block of uniforms
+    (persona, first name, last name, location, age). Returns a dict of equal-length arrays.
+    Ages are written into `ages_out` (int8, length n) when given.
+    """
+    n = u.shape[1]
+    persona_idx = uniform_index(u[0], len(PERSONAS)).astype(np.int8)
+    first = np.empty(n, dtype=object)
+    last = np.empty(n, dtype=object)
+    locations = np.empty(n, dtype=object)
+    # Names and locations come from ragged per-persona pools, so gather one persona slice at a time
+    for i in range(len(PERSONAS)):
+        mask = persona_idx == i
+        if not mask.any():
+            continue
+        first[mask] = PERSONA_FIRST[i][uniform_index(u[1, mask], len(PERSONA_FIRST[i]))]
+        last[mask] = PERSONA_LAST[i][uniform_index(u[2, mask], len(PERSONA_LAST[i]))]
+        locations[mask] = PERSONA_LOC[i][uniform_index(u[3, mask], len(PERSONA_LOC[i]))]
+    age_lo = PERSONA_AGE_LO[persona_idx]
+    ages = ages_out if ages_out is not None else np.empty(n, dtype=np.int8)
+    np.add(age_lo, uniform_index(u[4], PERSONA_AGE_HI[persona_idx] - age_lo + 1), out=ages, casting="unsafe")
     return {
-        "reviewer_name": full_name,
-        "reviewer_persona": persona["persona"],
-        "reviewer_age": age,
-        "reviewer_location": location,
-        "persona_focus": persona["focus"],
+        "persona_idx": persona_idx,
+        "reviewer_name": pc.binary_join_element_wise(pa.array(first, type=pa.string()), pa.array(last, type=pa.string()), " "),
+        "reviewer_age": ages,
+        "reviewer_location": pa.array(locations, type=pa.string()),
     }
 
 
 def adjust_probs_for_category(base_probs: np.ndarray, category: str) -> np.ndarray:
     bias = CATEGORY_BIASES.get(category, CATEGORY_BIASES.get("General", 0.0))
-    probs = base_probs.copy()
+    return shift_probs(base_probs.copy(), bias)
+
+
+def shift_probs(probs: np.ndarray, bias: float) -> np.ndarray:
+    """
+    Move probability mass between the low (1-2) and high (4-5) ratings, in place.
+    Plain scalar arithmetic on the five entries; no temporary arrays.
+    """
     if bias == 0:
         return probs
     shift = max(min(bias * 0.5, 0.15), -0.15)
+    p1, p2, p3, p4, p5 = (float(p) for p in probs)
     if shift > 0:
-        move_from_low = shift * (probs[0] + probs[1])
+        move_from_low = shift * (p1 + p2)
         if move_from_low > 0:
-            reduction = np.array([probs[0], probs[1]]) * (move_from_low / (probs[0] + probs[1]))
-            probs[0] -= reduction[0]; probs[1] -= reduction[1]
-            addition_total = probs[3] + probs[4]
+            factor = move_from_low / (p1 + p2)
+            p1 -= p1 * factor; p2 -= p2 * factor
+            addition_total = p4 + p5
             if addition_total <= 0:
-                probs[3] += move_from_low * 0.5; probs[4] += move_from_low * 0.5
+                p4 += move_from_low * 0.5; p5 += move_from_low * 0.5
             else:
-                probs[3] += move_from_low * (probs[3] / addition_total)
-                probs[4] += move_from_low * (probs[4] / addition_total)
+                p4, p5 = p4 + move_from_low * (p4 / addition_total), p5 + move_from_low * (p5 / addition_total)
     else:
-        move_from_high = (-shift) * (probs[3] + probs[4])
+        move_from_high = (-shift) * (p4 + p5)
         if move_from_high > 0:
-            reduction = np.array([probs[3], probs[4]]) * (move_from_high / (probs[3] + probs[4]))
-            probs[3] -= reduction[0]; probs[4] -= reduction[1]
-            addition_total = probs[0] + probs[1]
+            factor = move_from_high / (p4 + p5)
+            p4 -= p4 * factor; p5 -= p5 * factor
+            addition_total = p1 + p2
             if addition_total <= 0:
-                probs[0] += move_from_high * 0.5; probs[1] += move_from_high * 0.5
+                p1 += move_from_high * 0.5; p2 += move_from_high * 0.5
             else:
-                probs[0] += move_from_high * (probs[0] / addition_total)
-                probs[1] += move_from_high * (probs[1] / addition_total)
-    probs = np.clip(probs, 1e-6, 1.0)
+                p1, p2 = p1 + move_from_high * (p1 / addition_total), p2 + move_from_high * (p2 / addition_total)
+    probs[:] = (p1, p2, p3, p4, p5)
+    np.clip(probs, 1e-6, 1.0, out=probs)
     probs /= probs.sum()
     return probs
 
 
-def choose_num_reviews(rng: np.random.Generator, max_reviews: int) -> int:
-    if max_reviews < 1:
-        return 0
-    weights = [0.20, 0.28, 0.22, 0.15, 0.10, 0.05][: max_reviews + 1]
-    weights = np.array(weights, dtype=float)
-    weights /= weights.sum()
-    return int(rng.choice(list(range(max_reviews + 1)), p=weights))
-
-
-def choose_rating_for_category(rng: np.random.Generator, category: str) -> int:
-    probs = adjust_probs_for_category(BASE_RATING_PROBS.copy(), category)
-    return int(rng.choice([1, 2, 3, 4, 5], p=probs))
-
-
-def sample_review_date(rng: np.random.Generator, years_back: int = 3) -> str:
-    now = datetime.now()
-    start = now - timedelta(days=365 * years_back)
-    random_seconds = int(rng.integers(0, int((now - start).total_seconds()) + 1))
-    dt = start + timedelta(seconds=random_seconds)
-    return dt.strftime("%Y-%m-%d %I:%M:%S %p")  # 12-hour with AM/PM
-
-
-def safe_truncate(text: str, max_chars: int = MAX_REVIEW_CHARS) -> str:
-    return text if len(text) <= max_chars else text[: max_chars - 1]
-
-
-def make_review_text(rng: np.random.Generator, rating: int, product_name: str, product_category: str, persona_info: dict) -> str:
-    tpl = BASE_TEMPLATES[rating]
-    opener = rng.choice(tpl["openers"])
-    middle = rng.choice(tpl["middles"])
-    closer = rng.choice(tpl["closers"])
-    focus = persona_info.get("persona_focus", "")
-    persona_phrase = ""
-    if focus == "performance":
-        persona_phrase = "As someone who values performance, "
-    elif focus == "value":
-        persona_phrase = "As someone who looks for value, "
-    elif focus == "durability":
-        persona_phrase = "With kids in the house, "
-    elif focus == "weatherproofing":
-        persona_phrase = "I use it outdoors often, so "
-    elif focus == "ease_of_use":
-        persona_phrase = "I cook a lot and care about ease of use, so "
-    elif focus == "sound_quality":
-        persona_phrase = "As an audiophile, "
-    elif focus == "portability":
-        persona_phrase = "I travel a lot, so "
-    elif focus == "safety":
-        persona_phrase = "With pets around, "
-    category_phrase = f" In the {product_category} category, this product"
-    if rating >= 4:
-        extra = rng.choice(["It consistently performs well in daily use.", "Setup was straightforward and painless.", "Materials and fit/finish are impressive for the price."])
-    elif rating == 3:
-        extra = rng.choice(["It's serviceable for common tasks but not outstanding.", "It does what it needs to, but don't expect surprises.", "Good for occasional use or budget setups."])
-    else:
-        extra = rng.choice(["It caused repeated issues during normal use.", "Support and documentation were inadequate.", "I encountered multiple defects and usability problems."])
-    persona_line = f" - {persona_info['reviewer_name']}, {persona_info['reviewer_persona']}, {persona_info['reviewer_location']}"
-    full = " ".join([f"{opener} {product_name}.", f"{persona_phrase}{middle}", category_phrase + ".", extra, closer]) + " " + persona_line
-    return safe_truncate(full)
+def cumulative_probs(probs: np.ndarray) -> np.ndarray:
+    cum = np.cumsum(probs)
+    cum[-1] = 1.0  # guard against float drift so searchsorted never runs off the end
+    return cum
+
+
+# Rating distributions only depend on the category, so compute them once; row == category code
+CATEGORY_CUM_PROBS = np.array([
+    cumulative_probs(adjust_probs_for_category(BASE_RATING_PROBS, category))
+    for category in CATEGORY_NAMES
+])
+
+
+def category_codes(categories: pa.Array) -> np.ndarray:
+    """
+    Map category strings to int8 codes; unknown or null categories become "General".
+    """
+    codes = pc.fill_null(pc.index_in(categories, value_set=CATEGORY_NAME_ARRAY), GENERAL_CODE)
+    return codes.to_numpy(zero_copy_only=False).astype(np.int8)
+
+
+def num_reviews_cum_probs(max_reviews: int) -> np.ndarray:
+    weights = NUM_REVIEWS_WEIGHTS[: max(max_reviews, 0) + 1]
+    return cumulative_probs(weights / weights.sum())
+
+
+def choose_num_reviews(rng: np.random.Generator, cum_probs: np.ndarray, n: int) -> np.ndarray:
+    return np.searchsorted(cum_probs, rng.random(n), side="right").astype(np.int32)
+
+
+def choose_ratings_for_categories(u: np.ndarray, cat_codes: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    ratings = out if out is not None else np.empty(len(cat_codes), dtype=np.int8)
+    for code in np.unique(cat_codes):
+        mask = cat_codes == code
+        ratings[mask] = 1 + np.searchsorted(CATEGORY_CUM_PROBS[code], u[mask], side="right")
+    return ratings
+
+
+def sample_review_dates(u: np.ndarray, years_back: int = 3, epochs_out: Optional[np.ndarray] = None) -> pa.Array:
+    # Naive local wall-clock seconds, so formatting below reproduces datetime.now() times
+    end = np.datetime64(datetime.now(), "s").astype(np.int64)
+    start = end - 365 * years_back * 86400
+    epochs = epochs_out if epochs_out is not None else np.empty(len(u), dtype=np.int64)
+    np.add(start, uniform_index(u, int(end - start) + 1), out=epochs)
+    timestamps = pa.array(epochs, type=pa.timestamp("s"))
+    return pc.strftime(timestamps, format="%Y-%m-%d %I:%M:%S %p", locale="C")  # 12-hour with AM/PM
+
+
+def allocate_review_buffers(capacity: int) -> dict:
+    """
+    Fixed-capacity arrays reused by every batch; each batch works on [:total] views.
+    Safe because every batch is fully written out before the next one is generated.
+    """
+    return {
+        "uniforms": np.empty(UNIFORMS_PER_REVIEW * capacity),
+        "offsets": np.arange(capacity, dtype=np.int64),
+        "review_id": np.empty(capacity, dtype=np.int64),
+        "rating": np.empty(capacity, dtype=np.int8),
+        "reviewer_age": np.empty(capacity, dtype=np.int8),
+        "epoch": np.empty(capacity, dtype=np.int64),
+    }
+
+
+def safe_truncate(texts: pa.Array, max_chars: int = MAX_REVIEW_CHARS) -> pa.Array:
+    too_long = pc.greater(pc.utf8_length(texts), max_chars)
+    if not pc.any(too_long).as_py():
+        return texts  # the usual case: nothing to cut
+    # Slice only the overlong rows and splice them back in
+    truncated = pc.utf8_slice_codeunits(pc.filter(texts, too_long), 0, max_chars - 1)
+    return pc.replace_with_mask(texts, too_long, truncated)
+
+
+def make_review_texts(u: np.ndarray, ratings: np.ndarray, product_names: pa.Array, cat_codes: np.ndarray,
+                      personas: dict) -> pa.Array:
+    # `u` is a (4, n) block of uniforms for the template picks (every pool has the same number of choices)
+    opener_idx, middle_idx, closer_idx, extra_idx = uniform_index(u, OPENERS.shape[1])
+
+    def strings(values) -> pa.Array:
+        return pa.array(values, type=pa.string())
+
+    # Concatenate column-wise in Arrow instead of formatting one Python string per review
+    texts = pc.binary_join_element_wise(
+        strings(OPENERS[ratings, opener_idx]), " ", product_names, ". ",
+        PERSONA_PHRASE_ARRAY.take(personas["persona_idx"]), strings(MIDDLES[ratings, middle_idx]),
+        "  In the ", CATEGORY_NAME_ARRAY.take(cat_codes), " category, this product. ",
+        strings(EXTRAS[ratings, extra_idx]), " ", strings(CLOSERS[ratings, closer_idx]),
+        "  - ", personas["reviewer_name"], ", ", PERSONA_NAME_ARRAY.take(personas["persona_idx"]),
+        ", ", personas["reviewer_location"],
+        "",  # separator
+    )
+    return safe_truncate(texts)
 
 
 # -----------------------
 # Parquet streaming using ParquetFile.iter_batches
 # -----------------------
-def iter_products_from_parquet(parquet_path: str, id_col: str, name_col: str, category_col: Optional[str], batch_size: int) -> Iterator[pd.DataFrame]:
+def iter_products_from_parquet(parquet_path: str, id_col: str, name_col: str, category_col: Optional[str], batch_size: int) -> Iterator[pa.RecordBatch]:
     """
-    Stream (id, name, optional category) batches from a Parquet file
-    using pyarrow.parquet.ParquetFile.iter_batches for compatibility.
+    Stream (id, name, optional category) record batches from a Parquet file
+    using pyarrow.parquet.ParquetFile.iter_batches, decoding each batch once.
     """
-    try:
-        import pyarrow.parquet as pq
-        import pyarrow as pa
-    except Exception as e:
-        raise RuntimeError("pyarrow is required. Install with: pip install pyarrow") from e
-
     pf = pq.ParquetFile(parquet_path)
     # determine columns to read; parquet API requires existing columns
     columns = [id_col, name_col]
     if category_col:
         columns.append(category_col)
 
-    # iterate row-groups and within them iterate record batches
-    for rg_index in range(pf.num_row_groups):
-        # read the row-group into a table limited to columns
-        # using read_row_group then iter_batches provides predictable memory usage
-        row_group_table = pf.read_row_group(rg_index, columns=columns)
-        for batch in row_group_table.to_batches(max_chunksize=batch_size):
-            # convert batch to pandas
-            tb = pa.Table.from_batches([batch], schema=row_group_table.schema)
-            yield tb.to_pandas()
+    yield from pf.iter_batches(batch_size=batch_size, columns=columns)
 
 # -----------------------
 # Main entry
@@ -233,11 +334,13 @@ def main() -> None:
     parser.add_argument("--name-column", default="product_name", help="Product name column name.")
     parser.add_argument("--category-column", default="product_category", help="Optional product category column name (if present).")
     parser.add_argument("--output", required=True, help="Output file path (.parquet or .csv).")
-    parser.add_argument("--max-reviews-per-product", type=int, default=DEFAULT_MAX_REVIEWS, help="Maximum reviews per product (0..N).")
+    parser.add_argument("--max-reviews-per-product", type=int, default=DEFAULT_MAX_REVIEWS, help=f"Maximum reviews per product (0..{len(NUM_REVIEWS_WEIGHTS) - 1}).")
     parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="How many products to read per batch.")
     parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible outputs.")
     parser.add_argument("--years-back", type=int, default=3, help="How many years back to sample review dates from (default 3).")
     args = parser.parse_args()
+    if args.max_reviews_per_product > len(NUM_REVIEWS_WEIGHTS) - 1:
+        parser.error(f"--max-reviews-per-product must be at most {len(NUM_REVIEWS_WEIGHTS) - 1}")
 
     rng = np.random.default_rng(args.seed)
     out_is_parquet = args.output.lower().endswith(".parquet")
@@ -245,59 +348,74 @@ def main() -> None:
     if not (out_is_parquet or out_is_csv):
         raise ValueError("Output must end with .parquet or .csv")
 
+    n_reviews_cum = num_reviews_cum_probs(args.max_reviews_per_product)
+    # Largest possible batch output: every product gets the maximum review count
+    buffers = allocate_review_buffers(args.batch_size * (len(n_reviews_cum) - 1))
     parquet_writer = None
-    csv_header_written = False
+    csv_writer = None
     review_id_counter = 1
 
-    for df_batch in iter_products_from_parquet(args.input_parquet, args.id_column, args.name_column, args.category_column, args.batch_size):
-        rows_out: List[dict] = []
-        has_category = args.category_column in df_batch.columns
-        for _, p_row in df_batch.iterrows():
-            pid = int(p_row[args.id_column])
-            pname = str(p_row[args.name_column])
-            if has_category:
-                pcat = str(p_row[args.category_column]) if pd.notna(p_row[args.category_column]) else "General"
-            else:
-                pcat = pname.split("_", 1)[0] if "_" in pname else "General"
-            pcat = pcat if pcat in CATEGORY_BIASES else "General"
-            n_reviews = choose_num_reviews(rng, args.max_reviews_per_product)
-            for _ in range(n_reviews):
-                persona_info = sample_persona(rng)
-                rating = choose_rating_for_category(rng, pcat)
-                review_text = make_review_text(rng, rating, pname, pcat, persona_info)
-                review_date = sample_review_date(rng, years_back=args.years_back)
-                rows_out.append({
-                    "review_id": review_id_counter,
-                    "product_id": pid,
-                    "product_name": pname,
-                    "product_category": pcat,
-                    "rating": int(rating),
-                    "review_text": review_text,
-                    "reviewer_name": persona_info["reviewer_name"],
-                    "reviewer_persona": persona_info["reviewer_persona"],
-                    "reviewer_age": int(persona_info["reviewer_age"]),
-                    "reviewer_location": persona_info["reviewer_location"],
-                    "review_date": review_date,
-                })
-                review_id_counter += 1
-
-        if not rows_out:
+    for batch in iter_products_from_parquet(args.input_parquet, args.id_column, args.name_column, args.category_column, args.batch_size):
+        # Pull columns out once per batch; everything below works on whole arrays
+        pids = batch.column(args.id_column).cast(pa.int64()).to_numpy(zero_copy_only=False)
+        # Null names become "None", as str() did before the move to Arrow
+        pnames = pc.fill_null(batch.column(args.name_column).cast(pa.string()), "None")
+        if args.category_column in batch.schema.names:
+            pcats = batch.column(args.category_column).cast(pa.string())
+        else:
+            prefixes = pc.list_element(pc.split_pattern(pnames, "_", max_splits=1), 0)
+            pcats = pc.if_else(pc.match_substring(pnames, "_"), prefixes, "General")
+        cat_codes = category_codes(pcats)
+
+        n_reviews = choose_num_reviews(rng, n_reviews_cum, len(pids))
+        total = int(n_reviews.sum())
+        if total == 0:
             continue
 
-        out_df = pd.DataFrame(rows_out)
+        # One entry per review
+        review_pids = np.repeat(pids, n_reviews)
+        # Names stay in Arrow: gather them per review instead of repeating Python objects
+        review_pnames = pnames.take(np.repeat(np.arange(len(pids)), n_reviews))
+        review_cat_codes = np.repeat(cat_codes, n_reviews)
+
+        # One uniform buffer for every per-review draw: persona (5 rows), rating, template picks (4 rows), date
+        u = buffers["uniforms"][: UNIFORMS_PER_REVIEW * total].reshape(UNIFORMS_PER_REVIEW, total)
+        rng.random(out=u)
+        review_ids = np.add(buffers["offsets"][:total], review_id_counter, out=buffers["review_id"][:total])
+        personas = sample_personas(u[0:5], ages_out=buffers["reviewer_age"][:total])
+        ratings = choose_ratings_for_categories(u[5], review_cat_codes, out=buffers["rating"][:total])
+        review_texts = make_review_texts(u[6:10], ratings, review_pnames, review_cat_codes, personas)
+        review_dates = sample_review_dates(u[10], years_back=args.years_back, epochs_out=buffers["epoch"][:total])
+
+        # Column-wise from already-typed arrays; no per-review dicts or DataFrame
+        table = pa.Table.from_pydict({
+            "review_id": pa.array(review_ids, type=pa.int64()),
+            "product_id": pa.array(review_pids, type=pa.int64()),
+            "product_name": review_pnames,
+            "product_category": pa.DictionaryArray.from_arrays(review_cat_codes, CATEGORY_NAME_ARRAY),
+            "rating": pa.array(ratings, type=pa.int8()),
+            "review_text": review_texts,
+            "reviewer_name": personas["reviewer_name"],
+            "reviewer_persona": pa.DictionaryArray.from_arrays(personas["persona_idx"], PERSONA_NAME_ARRAY),
+            "reviewer_age": pa.array(personas["reviewer_age"], type=pa.int8()),
+            "reviewer_location": personas["reviewer_location"],
+            "review_date": review_dates,
+        })
+        review_id_counter += total
+
         if out_is_csv:
-            out_df.to_csv(args.output, mode="a", header=not csv_header_written, index=False, encoding="utf-8")
-            csv_header_written = True
+            if csv_writer is None:
+                csv_writer = pcsv.CSVWriter(args.output, table.schema)
+            csv_writer.write_table(table)
         else:
-            import pyarrow as pa
-            import pyarrow.parquet as pq
-            table = pa.Table.from_pandas(out_df, preserve_index=False)
             if parquet_writer is None:
-                parquet_writer = pq.ParquetWriter(args.output, table.schema, compression="snappy", use_dictionary=True)
-            parquet_writer.write_table(table)
+                parquet_writer = pq.ParquetWriter(args.output, table.schema, **PARQUET_WRITER_OPTIONS)
+            parquet_writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
 
     if parquet_writer is not None:
         parquet_writer.close()
+    if csv_writer is not None:
+        csv_writer.close()
 
     print(f"Done. Generated {review_id_counter - 1} reviews -> {args.output}")
 